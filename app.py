@@ -6,17 +6,18 @@ Transforms long movies into 2-minute recap videos with AI voiceover
 import os
 import uuid
 import json
+import hashlib
+import shutil
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from flask import Flask, request, jsonify, render_template, send_file
+from flask import Flask, Response, request, jsonify, render_template, send_file
 from flask_cors import CORS
 from dotenv import load_dotenv
 
 from services.video_processor import VideoProcessor
-from services.transcriber import Transcriber
-from services.summarizer import Summarizer
-from services.tts import TextToSpeech
-from services.compiler import VideoCompiler
+from services import get_transcriber, get_summarizer, get_tts, get_compiler
+from job_store import JobStore
 
 # Load environment variables
 load_dotenv()
@@ -26,15 +27,49 @@ CORS(app)
 
 # Configuration
 app.config['MAX_CONTENT_LENGTH'] = int(os.getenv('MAX_VIDEO_SIZE_MB', 2000)) * 1024 * 1024
-app.config['UPLOAD_FOLDER'] = os.path.join(os.path.dirname(__file__), 'uploads')
+
+# Hand downloads to the front proxy via X-Sendfile/X-Accel-Redirect when
+# deployed behind nginx; standalone, send_file uses the WSGI server's
+# file_wrapper, which maps to kernel sendfile(2) and skips userspace copies
+app.use_x_sendfile = os.getenv('USE_X_SENDFILE', 'false').lower() == 'true'
+
+
+def _pick_upload_folder():
+    """Stage uploads on tmpfs when it has comfortable headroom"""
+    try:
+        free = shutil.disk_usage('/dev/shm').free
+        if free > 2 * app.config['MAX_CONTENT_LENGTH']:
+            return '/dev/shm/movie_recap/uploads'
+    except OSError:
+        pass
+    return os.path.join(os.path.dirname(__file__), 'uploads')
+
+
+app.config['UPLOAD_FOLDER'] = _pick_upload_folder()
 app.config['OUTPUT_FOLDER'] = os.path.join(os.path.dirname(__file__), 'output')
 
 # Ensure folders exist
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 os.makedirs(app.config['OUTPUT_FOLDER'], exist_ok=True)
 
-# In-memory job storage (use Redis in production)
-jobs = {}
+# Redis-backed job storage (in-memory fallback for local development)
+store = JobStore()
+
+# GPU inventory for round-robin job placement
+try:
+    import torch
+    NUM_GPUS = torch.cuda.device_count()
+except ImportError:
+    NUM_GPUS = 0
+
+# Bounded worker pool: unbounded per-request threads caused GPU OOM and
+# serialized Whisper runs under concurrent uploads. With Redis, jobs are
+# handed to the dedicated worker.py process instead and this pool only
+# runs there; the in-process path is the no-Redis local-dev fallback.
+EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv('MAX_CONCURRENT_JOBS', max(NUM_GPUS, 2)))
+)
+GPU_SEMAPHORES = [threading.Semaphore(1) for _ in range(NUM_GPUS)]
 
 ALLOWED_EXTENSIONS = {'mp4', 'mkv', 'avi', 'mov', 'webm', 'wmv'}
 
@@ -43,76 +78,213 @@ def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+def looks_like_video(head: bytes) -> bool:
+    """Sniff container magic bytes so bad uploads are rejected up front"""
+    if len(head) < 12:
+        return False
+
+    return (
+        head[4:8] == b'ftyp' or                      # MP4 / MOV / M4V
+        head.startswith(b'\x1a\x45\xdf\xa3') or      # Matroska / WebM
+        (head.startswith(b'RIFF') and head[8:12] == b'AVI ') or
+        head.startswith(b'\x30\x26\xb2\x75')         # ASF (WMV)
+    )
+
+
+def save_upload(file, filepath: str) -> str:
+    """
+    Stream an upload to disk in 1 MiB chunks, validating the first chunk
+
+    Returns the BLAKE2 content hash used to dedup repeat uploads.
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    first = file.stream.read(1 << 20)
+
+    if not looks_like_video(first):
+        raise ValueError('File does not look like a supported video container')
+
+    with open(filepath, 'wb') as f:
+        f.write(first)
+        hasher.update(first)
+        while True:
+            chunk = file.stream.read(1 << 20)
+            if not chunk:
+                break
+            f.write(chunk)
+            hasher.update(chunk)
+
+        # The next reader (ffmpeg) scans the file front to back
+        _fadvise(f.fileno(), 'POSIX_FADV_SEQUENTIAL')
+
+    return hasher.hexdigest()
+
+
+def _fadvise(fd, advice_name):
+    """Apply a posix_fadvise hint where the platform supports it"""
+    advice = getattr(os, advice_name, None)
+    if advice is not None and hasattr(os, 'posix_fadvise'):
+        try:
+            os.posix_fadvise(fd, 0, 0, advice)
+        except OSError:
+            pass
+
+
+def _drop_page_cache(path):
+    """Tell the kernel we're done with a file's pages"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        _fadvise(fd, 'POSIX_FADV_DONTNEED')
+    finally:
+        os.close(fd)
+
+
 def process_video_job(job_id):
     """Background task to process video and create recap"""
-    job = jobs[job_id]
+    if GPU_SEMAPHORES:
+        # Round-robin jobs across GPUs, one job per device at a time.
+        # The index is passed into the transcriber, which loads one
+        # model per GPU - torch.cuda.set_device wouldn't reach the
+        # CTranslate2 backend
+        gpu_id = int(uuid.UUID(job_id)) % len(GPU_SEMAPHORES)
+        with GPU_SEMAPHORES[gpu_id]:
+            _run_video_job(job_id, gpu_id)
+    else:
+        _run_video_job(job_id)
+
+
+def dispatch_job(job_id):
+    """
+    Hand a job to the worker tier, or run it in-process without Redis
+
+    Gevent HTTP workers must never execute jobs themselves: the native
+    Whisper calls would freeze their event loop and every worker would
+    load its own model weights. When Redis is up the job id goes on the
+    shared queue for worker.py; the in-process pool is only for local
+    development where no separate worker runs.
+    """
+    if store.shared:
+        store.enqueue(job_id)
+    else:
+        EXECUTOR.submit(process_video_job, job_id)
+
+
+def _snap_to_scene_changes(timestamps, scene_changes, tolerance=2.0):
+    """Align requested scene starts to nearby detected shot boundaries"""
+    if not scene_changes:
+        return timestamps
+
+    snapped = []
+    for ts in timestamps:
+        start = ts.get('start', 0)
+        nearest = min(scene_changes, key=lambda change: abs(change - start))
+        if abs(nearest - start) <= tolerance:
+            ts = dict(ts, start=nearest)
+        snapped.append(ts)
+
+    return snapped
+
+
+def _run_video_job(job_id, gpu_id=0):
+    """
+    Run the processing steps for a job
+
+    The GPU-bound chain (transcribe -> script -> voiceover) is overlapped
+    with the ffmpeg/IO-bound work: scene-change detection runs during
+    transcription, and scene extraction runs while the voiceover is
+    synthesized. Only compilation needs both sides finished.
+    """
+    job = store.get(job_id)
 
     try:
         video_path = job['video_path']
         job_folder = os.path.join(app.config['OUTPUT_FOLDER'], job_id)
         os.makedirs(job_folder, exist_ok=True)
 
-        # Step 1: Extract audio
-        job['status'] = 'extracting_audio'
-        job['progress'] = 10
-        video_processor = VideoProcessor(video_path)
-        audio_path = video_processor.extract_audio(job_folder)
-        job['progress'] = 20
-
-        # Step 2: Transcribe audio
-        job['status'] = 'transcribing'
-        job['progress'] = 25
-        transcriber = Transcriber()
-        transcript = transcriber.transcribe(audio_path)
-        job['transcript'] = transcript
-        job['progress'] = 40
-
-        # Step 3: Generate recap script
-        job['status'] = 'generating_script'
-        job['progress'] = 45
-        summarizer = Summarizer()
-        recap_script = summarizer.generate_recap(
-            transcript,
-            job.get('movie_title', 'Unknown Movie'),
-            job.get('genre', 'Drama')
-        )
-        job['recap_script'] = recap_script
-        job['progress'] = 55
-
-        # Step 4: Generate voiceover
-        job['status'] = 'generating_voiceover'
-        job['progress'] = 60
-        tts = TextToSpeech()
-        voiceover_path = tts.generate(recap_script['narration'], job_folder)
-        job['progress'] = 70
-
-        # Step 5: Extract key scenes
-        job['status'] = 'extracting_scenes'
-        job['progress'] = 75
-        scene_timestamps = recap_script.get('scene_timestamps', [])
-        scenes = video_processor.extract_scenes(scene_timestamps, job_folder)
-        job['progress'] = 85
-
-        # Step 6: Compile final video
-        job['status'] = 'compiling'
-        job['progress'] = 90
-        compiler = VideoCompiler()
-        output_path = compiler.compile(
-            scenes,
-            voiceover_path,
-            job_folder,
-            recap_script.get('title', f"{job.get('movie_title', 'Movie')} - 2 Min Recap")
+        with ThreadPoolExecutor(max_workers=2) as stage_pool:
+            # Step 1: Extract audio
+            store.patch(job_id, status='extracting_audio', progress=10)
+            video_processor = VideoProcessor(video_path)
+            try:
+                # Decode straight to a 16 kHz array - no WAV intermediate
+                audio = video_processor.extract_audio_array()
+            except Exception as e:
+                print(f"In-memory audio decode failed ({e}), using ffmpeg")
+                audio = video_processor.extract_audio(job_folder)
+            store.patch(job_id, progress=20)
+
+            # Scene detection doesn't depend on the transcript - run it
+            # during transcription so its cost is hidden
+            scene_changes_future = stage_pool.submit(
+                video_processor.detect_scene_changes
+            )
+
+            # Step 2: Transcribe audio (reuse a previous job's transcript
+            # when the same file was uploaded before)
+            store.patch(job_id, status='transcribing', progress=25)
+            transcript = None
+            previous = store.job_for_hash(job.get('content_hash'))
+            if previous and previous.get('transcript'):
+                print(f"Job {job_id}: reusing transcript from job {previous['id']}")
+                transcript = previous['transcript']
+            else:
+                transcriber = get_transcriber(gpu_id)
+                transcript = transcriber.transcribe(audio)
+            store.patch(job_id, transcript=transcript, progress=40)
+            if job.get('content_hash'):
+                store.link_hash(job['content_hash'], job_id)
+
+            # Step 3: Generate recap script
+            store.patch(job_id, status='generating_script', progress=45)
+            summarizer = get_summarizer()
+            recap_script = summarizer.generate_recap(
+                transcript,
+                job.get('movie_title', 'Unknown Movie'),
+                job.get('genre', 'Drama')
+            )
+            store.patch(job_id, recap_script=recap_script, progress=55)
+
+            # Step 4 + 5: Voiceover and scene extraction are independent -
+            # synthesize audio while ffmpeg cuts the clips
+            store.patch(job_id, status='generating_voiceover', progress=60)
+            tts = get_tts()
+            voiceover_future = stage_pool.submit(
+                tts.generate, recap_script['narration'], job_folder
+            )
+
+            store.patch(job_id, status='extracting_scenes')
+            scene_timestamps = _snap_to_scene_changes(
+                recap_script.get('scene_timestamps', []),
+                scene_changes_future.result()
+            )
+            scenes = video_processor.extract_scenes(scene_timestamps, job_folder)
+            voiceover_path = voiceover_future.result()
+            store.patch(job_id, progress=85)
+
+            # Step 6: Compile final video
+            store.patch(job_id, status='compiling', progress=90)
+            compiler = get_compiler()
+            output_path = compiler.compile(
+                scenes,
+                voiceover_path,
+                job_folder,
+                recap_script.get('title', f"{job.get('movie_title', 'Movie')} - 2 Min Recap")
+            )
+
+        # Cleanup: the source video won't be re-read, release its pages
+        _drop_page_cache(video_path)
+        store.patch(
+            job_id,
+            status='completed',
+            progress=100,
+            output_path=output_path,
+            completed_at=datetime.now().isoformat()
         )
-        job['progress'] = 100
-
-        # Cleanup
-        job['status'] = 'completed'
-        job['output_path'] = output_path
-        job['completed_at'] = datetime.now().isoformat()
 
     except Exception as e:
-        job['status'] = 'failed'
-        job['error'] = str(e)
+        store.patch(job_id, status='failed', error=str(e))
         print(f"Job {job_id} failed: {e}")
 
 
@@ -143,49 +315,56 @@ def upload_video():
     ext = file.filename.rsplit('.', 1)[1].lower()
     filename = f"{job_id}.{ext}"
     filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-    file.save(filepath)
+
+    # Write to a .partial name and rename atomically so an interrupted
+    # upload can't be mistaken for a valid job input
+    try:
+        content_hash = save_upload(file, filepath + '.partial')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    os.rename(filepath + '.partial', filepath)
 
     # Get metadata from form
     movie_title = request.form.get('title', 'Unknown Movie')
     genre = request.form.get('genre', 'Drama')
 
-    # Create job
-    jobs[job_id] = {
+    # Create job and enqueue it right away - no second round-trip needed
+    store.set(job_id, {
         'id': job_id,
-        'status': 'uploaded',
-        'progress': 0,
+        'status': 'processing',
+        'progress': 5,
         'video_path': filepath,
+        'content_hash': content_hash,
         'movie_title': movie_title,
         'genre': genre,
         'created_at': datetime.now().isoformat(),
         'filename': file.filename
-    }
+    })
+
+    dispatch_job(job_id)
 
     return jsonify({
         'job_id': job_id,
-        'message': 'Video uploaded successfully',
+        'message': 'Video uploaded, processing started',
         'filename': file.filename
-    })
+    }), 202, {'Location': f'/api/status/{job_id}'}
 
 
 @app.route('/api/process/<job_id>', methods=['POST'])
 def start_processing(job_id):
-    """Start video processing"""
-    if job_id not in jobs:
-        return jsonify({'error': 'Job not found'}), 404
+    """Retry a failed job (uploads are enqueued automatically)"""
+    job = store.get(job_id)
 
-    job = jobs[job_id]
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
 
-    if job['status'] not in ['uploaded', 'failed']:
+    if job['status'] != 'failed':
         return jsonify({'error': f'Cannot process job in status: {job["status"]}'}), 400
 
     # Start background processing
-    job['status'] = 'processing'
-    job['progress'] = 5
+    store.patch(job_id, status='processing', progress=5)
 
-    thread = threading.Thread(target=process_video_job, args=(job_id,))
-    thread.daemon = True
-    thread.start()
+    dispatch_job(job_id)
 
     return jsonify({
         'message': 'Processing started',
@@ -196,10 +375,10 @@ def start_processing(job_id):
 @app.route('/api/status/<job_id>', methods=['GET'])
 def get_status(job_id):
     """Get job status"""
-    if job_id not in jobs:
-        return jsonify({'error': 'Job not found'}), 404
+    job = store.get(job_id)
 
-    job = jobs[job_id]
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
 
     response = {
         'id': job['id'],
@@ -221,10 +400,10 @@ def get_status(job_id):
 @app.route('/api/download/<job_id>', methods=['GET'])
 def download_video(job_id):
     """Download completed recap video"""
-    if job_id not in jobs:
-        return jsonify({'error': 'Job not found'}), 404
+    job = store.get(job_id)
 
-    job = jobs[job_id]
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
 
     if job['status'] != 'completed':
         return jsonify({'error': 'Video not ready for download'}), 400
@@ -238,11 +417,22 @@ def download_video(job_id):
     movie_title = job.get('movie_title', 'movie').replace(' ', '_')
     download_name = f"{movie_title}_2min_recap.mp4"
 
+    # Behind nginx, only authorize here and let the kernel serve the
+    # bytes via an internal location (see deploy/nginx.conf)
+    accel_prefix = os.getenv('ACCEL_REDIRECT_PREFIX')
+    if accel_prefix:
+        relative = os.path.relpath(output_path, app.config['OUTPUT_FOLDER'])
+        response = Response(mimetype='video/mp4')
+        response.headers['X-Accel-Redirect'] = f"{accel_prefix}/{relative}"
+        response.headers['Content-Disposition'] = f'attachment; filename="{download_name}"'
+        return response
+
     return send_file(
         output_path,
         mimetype='video/mp4',
         as_attachment=True,
-        download_name=download_name
+        download_name=download_name,
+        conditional=True  # Range support lets clients resume/parallelize
     )
 
 
@@ -250,7 +440,7 @@ def download_video(job_id):
 def list_jobs():
     """List all jobs"""
     job_list = []
-    for job_id, job in jobs.items():
+    for job in store.all():
         job_list.append({
             'id': job['id'],
             'status': job['status'],
@@ -266,10 +456,10 @@ def list_jobs():
 @app.route('/api/script/<job_id>', methods=['GET'])
 def get_script(job_id):
     """Get the generated recap script"""
-    if job_id not in jobs:
-        return jsonify({'error': 'Job not found'}), 404
+    job = store.get(job_id)
 
-    job = jobs[job_id]
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
 
     if not job.get('recap_script'):
         return jsonify({'error': 'Script not yet generated'}), 400
@@ -280,10 +470,10 @@ def get_script(job_id):
 @app.route('/api/transcript/<job_id>', methods=['GET'])
 def get_transcript(job_id):
     """Get the full transcript"""
-    if job_id not in jobs:
-        return jsonify({'error': 'Job not found'}), 404
+    job = store.get(job_id)
 
-    job = jobs[job_id]
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
 
     if not job.get('transcript'):
         return jsonify({'error': 'Transcript not yet generated'}), 400
@@ -6,6 +6,7 @@ Supports: File upload, Direct URL, YouTube links
 
 import os
 import uuid
+import shutil
 import tempfile
 import gradio as gr
 
@@ -15,11 +16,32 @@ os.environ["HF_HOME"] = "/tmp/hf_home"
 
 # Import services
 from services.video_processor import VideoProcessor
-from services.transcriber import Transcriber
-from services.summarizer import Summarizer
-from services.tts import TextToSpeech
-from services.compiler import VideoCompiler
 from services.downloader import VideoDownloader
+from services import get_transcriber, get_summarizer, get_tts, get_compiler
+
+
+def warm_services():
+    """Pre-build shared services so the first request doesn't pay warm-up"""
+    get_transcriber()
+    get_tts()
+    get_compiler()
+
+    try:
+        get_summarizer()
+    except ValueError as e:
+        # Missing OPENAI_API_KEY - surface it in logs but let the UI start
+        print(f"Warning: {e}")
+
+
+def _job_root(video_file=None):
+    """Prefer tmpfs for scratch files when free RAM covers the job"""
+    try:
+        needed = 2 * os.path.getsize(video_file) if video_file else 2 << 30
+        if shutil.disk_usage('/dev/shm').free > needed:
+            return '/dev/shm'
+    except OSError:
+        pass
+    return tempfile.gettempdir()
 
 
 def process_movie(
@@ -46,7 +68,7 @@ def process_movie(
     """
     # Create temp directory for this job
     job_id = str(uuid.uuid4())[:8]
-    job_folder = os.path.join(tempfile.gettempdir(), f"recap_{job_id}")
+    job_folder = os.path.join(_job_root(video_file), f"recap_{job_id}")
     os.makedirs(job_folder, exist_ok=True)
 
     video_path = None
@@ -82,16 +104,21 @@ def process_movie(
 
         # Step 2: Extract audio
         progress(0.15, desc="Extracting audio from video...")
-        audio_path = video_processor.extract_audio(job_folder)
+        try:
+            # Decode straight to a 16 kHz array - no WAV intermediate
+            audio = video_processor.extract_audio_array()
+        except Exception as e:
+            print(f"In-memory audio decode failed ({e}), using ffmpeg")
+            audio = video_processor.extract_audio(job_folder)
 
         # Step 3: Transcribe audio
         progress(0.20, desc="Transcribing audio (this may take a while)...")
-        transcriber = Transcriber()
-        transcript = transcriber.transcribe(audio_path)
+        transcriber = get_transcriber()
+        transcript = transcriber.transcribe(audio)
 
         # Step 4: Generate recap script
         progress(0.45, desc="Generating recap script with AI...")
-        summarizer = Summarizer()
+        summarizer = get_summarizer()
         recap_script = summarizer.generate_recap(
             transcript,
             movie_title,
@@ -102,7 +129,8 @@ def process_movie(
 
         # Step 5: Generate voiceover
         progress(0.55, desc="Creating voiceover narration...")
-        tts = TextToSpeech(voice=voice_style)
+        tts = get_tts()
+        tts.voice = voice_style
         voiceover_path = tts.generate(narration, job_folder)
 
         # Step 6: Extract key scenes (9:16 format with face tracking)
@@ -116,7 +144,7 @@ def process_movie(
 
         # Step 7: Compile final video with DNA modification
         progress(0.80, desc="Compiling final recap video...")
-        compiler = VideoCompiler()
+        compiler = get_compiler()
         output_path = compiler.compile(
             scenes,
             voiceover_path,
@@ -307,6 +335,7 @@ def create_demo():
 
 # Create and launch the app
 if __name__ == "__main__":
+    warm_services()
     demo = create_demo()
     demo.queue(max_size=5)  # Enable queue for long-running tasks
     demo.launch(
@@ -0,0 +1,23 @@
+"""
+Gunicorn configuration for the Flask API
+
+Gevent workers keep thousands of /api/status polling sockets cheap
+(greenlets, not threads) and let send_file cooperate with downloads.
+
+HTTP workers must not execute jobs: gevent monkey-patches threading,
+so a minutes-long native Whisper call would freeze a worker's event
+loop, and every extra worker process would load its own model weights.
+With Redis the app only enqueues jobs for the dedicated worker.py
+process and WEB_CONCURRENCY can be raised safely; without Redis jobs
+run in-process, so keep the default of a single worker.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', 5000)}"
+worker_class = 'gevent'
+workers = int(os.getenv('WEB_CONCURRENCY', 1))
+worker_connections = 1000
+
+# Long downloads shouldn't kill workers; jobs run in worker.py
+timeout = 0
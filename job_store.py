@@ -0,0 +1,158 @@
+"""
+Job Store
+Redis-backed job state so status survives restarts and scales across
+workers, with an in-memory fallback for local development
+"""
+
+import os
+import json
+from typing import Dict, List, Optional
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+
+class JobStore:
+    """Store and update job state keyed by job id"""
+
+    # Large nested payloads are stored as separate JSON keys so that
+    # status polls (HGETALL on the top-level hash) stay cheap
+    BLOB_FIELDS = ('transcript', 'recap_script')
+
+    # Fields that should come back as numbers, not Redis strings
+    INT_FIELDS = ('progress',)
+
+    # Shared work queue consumed by the dedicated job worker
+    QUEUE_KEY = 'jobs:queue'
+
+    def __init__(self, url: str = None):
+        """
+        Connect to Redis, or fall back to a process-local dict
+
+        Args:
+            url: Redis connection URL (env: REDIS_URL)
+        """
+        url = url or os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+        self._redis = None
+        self._memory = None
+
+        if redis is not None:
+            try:
+                client = redis.Redis.from_url(url, decode_responses=True)
+                client.ping()
+                self._redis = client
+            except redis.exceptions.RedisError:
+                pass
+
+        if self._redis is None:
+            print("Warning: Redis unavailable, using in-memory job store")
+            self._memory = {}
+            self._hashes = {}
+
+    @property
+    def shared(self) -> bool:
+        """Whether state (and the job queue) is visible to other processes"""
+        return self._redis is not None
+
+    def enqueue(self, job_id: str):
+        """Push a job id onto the work queue for the dedicated worker"""
+        self._redis.rpush(self.QUEUE_KEY, job_id)
+
+    def dequeue(self, timeout: int = 5) -> Optional[str]:
+        """Block up to timeout seconds for the next queued job id"""
+        item = self._redis.blpop(self.QUEUE_KEY, timeout=timeout)
+        return item[1] if item else None
+
+    def _hash_key(self, job_id: str) -> str:
+        return f"job:{job_id}"
+
+    def _blob_key(self, job_id: str, field: str) -> str:
+        return f"job:{job_id}:{field}"
+
+    def exists(self, job_id: str) -> bool:
+        """Check whether a job is known"""
+        if self._redis is not None:
+            return bool(self._redis.exists(self._hash_key(job_id)))
+        return job_id in self._memory
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Fetch full job state including blob fields"""
+        if self._redis is None:
+            job = self._memory.get(job_id)
+            return dict(job) if job is not None else None
+
+        job = self._redis.hgetall(self._hash_key(job_id))
+        if not job:
+            return None
+
+        for field in self.INT_FIELDS:
+            if field in job:
+                job[field] = int(job[field])
+
+        for field in self.BLOB_FIELDS:
+            blob = self._redis.get(self._blob_key(job_id, field))
+            if blob:
+                job[field] = json.loads(blob)
+
+        return job
+
+    def set(self, job_id: str, mapping: Dict):
+        """Create or replace a job"""
+        self.patch(job_id, **mapping)
+
+    def patch(self, job_id: str, **fields):
+        """Update a subset of a job's fields"""
+        if self._redis is None:
+            self._memory.setdefault(job_id, {}).update(fields)
+            return
+
+        blobs = {k: v for k, v in fields.items() if k in self.BLOB_FIELDS}
+        scalars = {k: v for k, v in fields.items() if k not in self.BLOB_FIELDS}
+
+        if scalars:
+            self._redis.hset(self._hash_key(job_id), mapping={
+                k: '' if v is None else v for k, v in scalars.items()
+            })
+
+        for field, value in blobs.items():
+            self._redis.set(self._blob_key(job_id, field), json.dumps(value))
+
+    def link_hash(self, digest: str, job_id: str):
+        """Remember which job holds results for this content hash"""
+        if self._redis is None:
+            self._hashes[digest] = job_id
+        else:
+            self._redis.set(f"hash:{digest}", job_id)
+
+    def job_for_hash(self, digest: str) -> Optional[Dict]:
+        """Fetch the job previously linked to this content hash, if any"""
+        if not digest:
+            return None
+
+        if self._redis is None:
+            job_id = self._hashes.get(digest)
+        else:
+            job_id = self._redis.get(f"hash:{digest}")
+
+        return self.get(job_id) if job_id else None
+
+    def all(self) -> List[Dict]:
+        """List top-level state of all jobs (without blob fields)"""
+        if self._redis is None:
+            return [dict(job) for job in self._memory.values()]
+
+        job_list = []
+        for key in self._redis.scan_iter(match='job:*', count=100):
+            # Skip blob keys (job:{id}:{field})
+            if key.count(':') != 1:
+                continue
+            job = self._redis.hgetall(key)
+            if job:
+                for field in self.INT_FIELDS:
+                    if field in job:
+                        job[field] = int(job[field])
+                job_list.append(job)
+
+        return job_list
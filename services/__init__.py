@@ -2,6 +2,8 @@
 Movie Recap Generator Services
 """
 
+import threading
+
 from .video_processor import VideoProcessor
 from .transcriber import Transcriber
 from .summarizer import Summarizer
@@ -9,11 +11,61 @@ from .tts import TextToSpeech
 from .compiler import VideoCompiler
 from .downloader import VideoDownloader
 
+# Lazily-initialized shared service instances. Transcriber holds ~GBs of
+# model weights, so constructing it per job is the dominant cold-start
+# cost; the others are cheap but stateless, so one instance each is enough.
+_singletons = {}
+_singletons_lock = threading.Lock()
+
+
+def _get_singleton(key, factory):
+    """Return the shared instance for key, creating it on first use"""
+    instance = _singletons.get(key)
+    if instance is None:
+        with _singletons_lock:
+            instance = _singletons.get(key)
+            if instance is None:
+                instance = factory()
+                _singletons[key] = instance
+    return instance
+
+
+def get_transcriber(device_index: int = 0) -> Transcriber:
+    """Shared Transcriber for a GPU (keeps its Whisper weights loaded)
+
+    One cached instance per device index, so multi-GPU hosts place
+    concurrent jobs on different GPUs instead of piling onto GPU 0.
+    """
+    return _get_singleton(
+        (Transcriber, device_index),
+        lambda: Transcriber(device_index=device_index)
+    )
+
+
+def get_summarizer() -> Summarizer:
+    """Shared Summarizer"""
+    return _get_singleton(Summarizer, Summarizer)
+
+
+def get_tts() -> TextToSpeech:
+    """Shared TextToSpeech"""
+    return _get_singleton(TextToSpeech, TextToSpeech)
+
+
+def get_compiler() -> VideoCompiler:
+    """Shared VideoCompiler"""
+    return _get_singleton(VideoCompiler, VideoCompiler)
+
+
 __all__ = [
     'VideoProcessor',
     'Transcriber',
     'Summarizer',
     'TextToSpeech',
     'VideoCompiler',
-    'VideoDownloader'
+    'VideoDownloader',
+    'get_transcriber',
+    'get_summarizer',
+    'get_tts',
+    'get_compiler'
 ]
@@ -6,6 +6,8 @@ Generates movie recap scripts using OpenAI GPT
 import os
 import json
 import re
+import hashlib
+import tempfile
 from typing import Dict, List, Optional
 from openai import OpenAI
 
@@ -21,6 +23,15 @@ class Summarizer:
         self.client = OpenAI(api_key=api_key)
         self.model = os.getenv('OPENAI_MODEL', 'gpt-4-turbo-preview')
 
+        # Recaps are deterministic per (transcript, title, genre, model),
+        # so cache them on disk - re-runs of the same movie (e.g. trying
+        # a different voice) skip the LLM call entirely
+        self.cache_dir = os.getenv(
+            'RECAP_CACHE_DIR',
+            os.path.join(tempfile.gettempdir(), 'recap_cache')
+        )
+        os.makedirs(self.cache_dir, exist_ok=True)
+
     def generate_recap(
         self,
         transcript: Dict,
@@ -50,6 +61,13 @@ class Summarizer:
 
         movie_duration = transcript.get('duration', 7200)  # Default 2 hours
 
+        cache_key = self._cache_key(
+            transcript_text, movie_title, genre, target_duration, style
+        )
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
         prompt = self._build_prompt(
             transcript_text,
             movie_title,
@@ -60,9 +78,8 @@ class Summarizer:
         )
 
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
+            content = self._stream_completion(
+                [
                     {
                         "role": "system",
                         "content": self._get_system_prompt()
@@ -72,16 +89,63 @@ class Summarizer:
                         "content": prompt
                     }
                 ],
-                temperature=0.7,
                 max_tokens=4000
             )
 
-            content = response.choices[0].message.content
-            return self._parse_response(content, movie_title, movie_duration)
+            recap = self._parse_response(content, movie_title, movie_duration)
+            self._cache_set(cache_key, recap)
+            return recap
 
         except Exception as e:
             raise RuntimeError(f"Failed to generate recap: {str(e)}")
 
+    def _stream_completion(self, messages: List[Dict], max_tokens: int) -> str:
+        """
+        Run a chat completion with streaming and return the full text
+
+        Tokens accumulate as they arrive instead of sitting in the API's
+        response buffer until the last one is generated, which also keeps
+        long generations clear of proxy idle timeouts.
+        """
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=0.7,
+            max_tokens=max_tokens,
+            stream=True
+        )
+
+        parts = []
+        for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+
+        return ''.join(parts)
+
+    def _cache_key(self, transcript: str, title: str, genre: str,
+                   duration: int, style: str) -> str:
+        """Hash the inputs that determine the recap output"""
+        raw = '|'.join([transcript, title, genre, str(duration), style, self.model])
+        return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+    def _cache_get(self, key: str) -> Optional[Dict]:
+        """Load a cached recap, tolerating missing/corrupt entries"""
+        path = os.path.join(self.cache_dir, f"{key}.json")
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def _cache_set(self, key: str, recap: Dict):
+        """Persist a recap; cache failures must not fail the job"""
+        path = os.path.join(self.cache_dir, f"{key}.json")
+        try:
+            with open(path, 'w') as f:
+                json.dump(recap, f)
+        except OSError:
+            pass
+
     def _get_system_prompt(self) -> str:
         """Get the system prompt for recap generation"""
         return """You are an expert movie recap narrator, known for creating engaging,
@@ -162,27 +226,36 @@ Make the narration {style} and suitable for the {genre} genre."""
         if len(text) <= max_length:
             return text
 
+        # Very long transcripts: sample every Nth sentence instead of
+        # raw slices, keeping boundaries intact and the token count fed
+        # to the API (its latency and cost dominate this module) low
+        if len(text) > 1_000_000:
+            sentences = re.findall(r'[^.!?]+[.!?]', text)
+            if sentences:
+                step = max(1, len(text) // max_length)
+                condensed = ' '.join(sentences[::step])
+                if len(condensed) <= max_length:
+                    return condensed
+
         # Split into roughly equal parts and take samples
         parts = 5
         part_length = len(text) // parts
         sample_length = max_length // parts
 
-        condensed = []
-        for i in range(parts):
-            start = i * part_length
-            end = start + sample_length
-            condensed.append(text[start:end])
-
-        return "\n[...]\n".join(condensed)
+        return "\n[...]\n".join(
+            text[i * part_length : i * part_length + sample_length]
+            for i in range(parts)
+        )
 
     def _parse_response(self, content: str, title: str, duration: float) -> Dict:
         """Parse the AI response into structured data"""
         try:
-            # Try to extract JSON from the response
-            json_match = re.search(r'\{[\s\S]*\}', content)
-            if json_match:
-                data = json.loads(json_match.group())
-                return data
+            # Extract the JSON object by scanning for the outermost
+            # braces - a plain find/rfind, no regex backtracking
+            first = content.find('{')
+            last = content.rfind('}')
+            if first != -1 and last > first:
+                return json.loads(content[first:last + 1])
         except json.JSONDecodeError:
             pass
 
@@ -212,9 +285,8 @@ Make the narration {style} and suitable for the {genre} genre."""
     def refine_narration(self, narration: str, feedback: str) -> str:
         """Refine narration based on user feedback"""
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
+            return self._stream_completion(
+                [
                     {
                         "role": "system",
                         "content": "You are a script editor. Refine the narration based on the feedback while maintaining the same length and structure."
@@ -224,11 +296,8 @@ Make the narration {style} and suitable for the {genre} genre."""
                         "content": f"ORIGINAL NARRATION:\n{narration}\n\nFEEDBACK:\n{feedback}\n\nPlease provide the refined narration:"
                     }
                 ],
-                temperature=0.7,
                 max_tokens=2000
             )
 
-            return response.choices[0].message.content
-
         except Exception as e:
             raise RuntimeError(f"Failed to refine narration: {str(e)}")
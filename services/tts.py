@@ -4,10 +4,22 @@ Generates voiceover audio using Edge-TTS (Microsoft)
 """
 
 import os
+import re
+import json
+import time
+import shutil
 import asyncio
+import hashlib
+import threading
+import subprocess
 import edge_tts
 from typing import Optional, List, Dict
 
+try:
+    import mutagen
+except ImportError:
+    mutagen = None
+
 
 class TextToSpeech:
     """Generate voiceover audio from text"""
@@ -41,6 +53,37 @@ class TextToSpeech:
         self.rate = "+0%"  # Speech rate adjustment
         self.pitch = "+0Hz"  # Pitch adjustment
 
+        # Identical narration fragments (stock intros/outros) otherwise
+        # pay the synthesis round trip every compile
+        self.cache_dir = os.getenv(
+            'TTS_CACHE_DIR',
+            os.path.expanduser('~/.cache/movie_recap/tts')
+        )
+        self.cache_max_mb = int(os.getenv('TTS_CACHE_MAX_MB', 500))
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    # One background event loop serves every TTS call in the process:
+    # no per-call loop setup, and run_coroutine_threadsafe makes it
+    # safe to drive from any worker thread at once
+    _loop = None
+    _loop_lock = threading.Lock()
+
+    @classmethod
+    def _run(cls, coro):
+        """Run a coroutine on the shared background event loop"""
+        if cls._loop is None:
+            with cls._loop_lock:
+                if cls._loop is None:
+                    loop = asyncio.new_event_loop()
+                    threading.Thread(
+                        target=loop.run_forever,
+                        name='tts-loop',
+                        daemon=True
+                    ).start()
+                    cls._loop = loop
+
+        return asyncio.run_coroutine_threadsafe(coro, cls._loop).result()
+
     def generate(
         self,
         text: str,
@@ -60,16 +103,146 @@ class TextToSpeech:
         """
         output_path = os.path.join(output_folder, filename)
 
-        # Run async function in sync context
-        asyncio.run(self._generate_async(text, output_path))
+        cache_key = self._cache_key(text)
+        cached = self._cache_lookup(cache_key)
+        if cached is not None:
+            shutil.copyfile(cached, output_path)
+            return output_path
+
+        # Sentences are independent requests to the TTS service - overlap
+        # them instead of paying per-request setup sequentially
+        sentences = self._split_sentences(text)
 
+        if len(sentences) <= 1:
+            self._run(self._generate_async(text, output_path))
+        else:
+            self._run(self._generate_batch(sentences, output_folder, output_path))
+
+        self._cache_store(cache_key, output_path)
         return output_path
 
+    def _cache_key(self, text: str) -> str:
+        """Hash the inputs that determine the synthesized audio"""
+        raw = '|'.join([text, self.voice, self.rate, self.pitch, 'edge-tts'])
+        return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+    def _cache_lookup(self, key: str) -> Optional[str]:
+        """Path of the cached MP3 for this key, if present"""
+        path = os.path.join(self.cache_dir, f"{key}.mp3")
+        return path if os.path.exists(path) else None
+
+    def _cache_store(self, key: str, audio_path: str):
+        """Persist synthesized audio; cache failures must not fail the job"""
+        try:
+            shutil.copyfile(audio_path, os.path.join(self.cache_dir, f"{key}.mp3"))
+            self._cache_evict()
+        except OSError:
+            pass
+
+    def _cache_evict(self):
+        """Drop least-recently-used entries once the cache exceeds its cap"""
+        entries = []
+        total = 0
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.is_file():
+                    stat = entry.stat()
+                    entries.append((stat.st_atime, stat.st_size, entry.path))
+                    total += stat.st_size
+
+        limit = self.cache_max_mb * 1024 * 1024
+        if total <= limit:
+            return
+
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= limit:
+                break
+
+    @staticmethod
+    def _split_sentences(text: str) -> List[str]:
+        """Split narration into sentences for batched synthesis"""
+        sentences = re.split(r'(?<=[.!?])\s+', text.strip())
+        return [s for s in sentences if s]
+
+    async def _generate_batch(
+        self,
+        sentences: List[str],
+        output_folder: str,
+        output_path: str,
+        max_concurrency: int = 4
+    ):
+        """Synthesize sentences concurrently, then concatenate without re-encode"""
+        semaphore = asyncio.Semaphore(max_concurrency)
+        part_paths = [
+            os.path.join(output_folder, f"vo_part_{i:03d}.mp3")
+            for i in range(len(sentences))
+        ]
+
+        async def synthesize(sentence, part_path):
+            async with semaphore:
+                communicate = edge_tts.Communicate(
+                    sentence,
+                    self.voice,
+                    rate=self.rate,
+                    pitch=self.pitch
+                )
+                await communicate.save(part_path)
+
+        await asyncio.gather(*(
+            synthesize(sentence, path)
+            for sentence, path in zip(sentences, part_paths)
+        ))
+
+        self._concat_parts(part_paths, output_path)
+
+        for path in part_paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _concat_parts(self, part_paths: List[str], output_path: str):
+        """Join MP3 parts with the concat demuxer (stream copy)"""
+        list_path = output_path + '.parts.txt'
+
+        with open(list_path, 'w') as f:
+            for path in part_paths:
+                escaped = path.replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+
+        cmd = [
+            'ffmpeg', '-y',
+            '-f', 'concat',
+            '-safe', '0',
+            '-i', list_path,
+            '-c', 'copy',
+            output_path
+        ]
+
+        try:
+            subprocess.run(cmd, capture_output=True, check=True)
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"Failed to join voiceover parts: {e.stderr.decode()}")
+        finally:
+            try:
+                os.remove(list_path)
+            except OSError:
+                pass
+
     async def _generate_async(self, text: str, output_path: str):
         """Async implementation of TTS generation"""
+        await self._generate_one(self.voice, text, output_path)
+
+    async def _generate_one(self, voice: str, text: str, output_path: str):
+        """Synthesize one utterance with an explicit voice"""
         communicate = edge_tts.Communicate(
             text,
-            self.voice,
+            voice,
             rate=self.rate,
             pitch=self.pitch
         )
@@ -91,35 +264,193 @@ class TextToSpeech:
             Dict with audio_path and word timestamps
         """
         output_path = os.path.join(output_folder, filename)
-        timestamps = []
 
-        async def generate_with_sync():
-            communicate = edge_tts.Communicate(
-                text,
-                self.voice,
-                rate=self.rate,
-                pitch=self.pitch
+        # Sentence granularity makes the cache useful: editing one line
+        # re-synthesizes one sentence, and stock phrases hit every time
+        sentences = self._split_sentences(text)
+
+        if len(sentences) <= 1:
+            timestamps, duration = self._run(
+                self._synthesize_with_boundaries(text, output_path)
             )
+            return {
+                "audio_path": output_path,
+                "timestamps": timestamps,
+                "total_duration": duration
+            }
 
-            with open(output_path, "wb") as f:
-                async for chunk in communicate.stream():
-                    if chunk["type"] == "audio":
-                        f.write(chunk["data"])
-                    elif chunk["type"] == "WordBoundary":
-                        timestamps.append({
-                            "text": chunk["text"],
-                            "offset": chunk["offset"] / 10000000,  # Convert to seconds
-                            "duration": chunk["duration"] / 10000000
-                        })
+        part_paths = [
+            os.path.join(output_folder, f"vo_ts_part_{i:03d}.mp3")
+            for i in range(len(sentences))
+        ]
+        part_timestamps = [None] * len(sentences)
+        part_durations = [None] * len(sentences)
+
+        # Serve cached sentences, synthesize the rest concurrently
+        misses = []
+        for i, (sentence, part_path) in enumerate(zip(sentences, part_paths)):
+            key = self._cache_key(sentence)
+            cached = self._cache_lookup(key)
+            sidecar = os.path.join(self.cache_dir, f"{key}.json")
+            if cached is not None and os.path.exists(sidecar):
+                shutil.copyfile(cached, part_path)
+                try:
+                    with open(sidecar) as f:
+                        data = json.load(f)
+                    if isinstance(data, dict):
+                        part_timestamps[i] = data.get("boundaries")
+                        part_durations[i] = data.get("duration")
+                    else:
+                        # Older sidecars stored the bare boundary list
+                        part_timestamps[i] = data
+                    continue
+                except (OSError, json.JSONDecodeError):
+                    part_timestamps[i] = None
+            misses.append((i, sentence, part_path, key))
+
+        if misses:
+            async def synth_all():
+                semaphore = asyncio.Semaphore(4)
+
+                async def synth(index, sentence, part_path):
+                    async with semaphore:
+                        part_timestamps[index], part_durations[index] = \
+                            await self._synthesize_with_boundaries(sentence, part_path)
+
+                await asyncio.gather(*(
+                    synth(index, sentence, part_path)
+                    for index, sentence, part_path, _ in misses
+                ))
+
+            self._run(synth_all())
+
+            for index, _, part_path, key in misses:
+                self._cache_store(key, part_path)
+                try:
+                    with open(os.path.join(self.cache_dir, f"{key}.json"), 'w') as f:
+                        json.dump({
+                            "boundaries": part_timestamps[index],
+                            "duration": part_durations[index]
+                        }, f)
+                except OSError:
+                    pass
+
+        # Concatenate and shift each sentence's boundaries by the
+        # cumulative duration of everything before it
+        self._concat_parts(part_paths, output_path)
 
-        asyncio.run(generate_with_sync())
+        timestamps = []
+        cursor = 0.0
+        for part_path, boundaries, duration in zip(
+            part_paths, part_timestamps, part_durations
+        ):
+            for boundary in boundaries or []:
+                timestamps.append({
+                    "text": boundary["text"],
+                    "offset": boundary["offset"] + cursor,
+                    "duration": boundary["duration"]
+                })
+            if duration is None:
+                duration = self._audio_duration(part_path)
+            cursor += duration
+
+        for path in part_paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
 
         return {
             "audio_path": output_path,
             "timestamps": timestamps,
-            "total_duration": timestamps[-1]["offset"] + timestamps[-1]["duration"] if timestamps else 0
+            "total_duration": cursor
         }
 
+    # Total stream time from ffmpeg's progress lines, e.g. time=00:00:12.48
+    _MUX_TIME_RE = re.compile(r'time=(\d+):(\d+):(\d+\.?\d*)')
+
+    async def _synthesize_with_boundaries(self, text: str, output_path: str):
+        """
+        Synthesize one utterance, returning (word boundaries, duration)
+
+        Audio chunks are piped into an ffmpeg remux as they arrive, so
+        writing the MP3 overlaps the network download, and the mux time
+        ffmpeg reports replaces a separate ffprobe duration pass.
+        """
+        communicate = edge_tts.Communicate(
+            text,
+            self.voice,
+            rate=self.rate,
+            pitch=self.pitch
+        )
+
+        proc = await asyncio.create_subprocess_exec(
+            'ffmpeg', '-y',
+            '-f', 'mp3',
+            '-i', 'pipe:0',
+            '-c', 'copy',
+            output_path,
+            stdin=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+
+        timestamps = []
+        async for chunk in communicate.stream():
+            if chunk["type"] == "audio":
+                proc.stdin.write(chunk["data"])
+                await proc.stdin.drain()
+            elif chunk["type"] == "WordBoundary":
+                timestamps.append({
+                    "text": chunk["text"],
+                    "offset": chunk["offset"] * 1e-7,  # 100ns ticks to seconds
+                    "duration": chunk["duration"] * 1e-7
+                })
+
+        proc.stdin.close()
+        stderr = await proc.stderr.read()
+        await proc.wait()
+        if proc.returncode != 0:
+            raise RuntimeError(
+                f"Failed to mux synthesized audio: {stderr.decode(errors='replace')}"
+            )
+
+        times = self._MUX_TIME_RE.findall(stderr.decode(errors='replace'))
+        if times:
+            hours, minutes, seconds = times[-1]
+            duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+        else:
+            duration = self._audio_duration(output_path)
+
+        return timestamps, duration
+
+    @staticmethod
+    def _audio_duration(path: str) -> float:
+        """Duration of an audio file in seconds
+
+        Reading the header in-process with mutagen is orders of
+        magnitude cheaper than forking ffprobe; ffprobe stays as the
+        fallback for anything mutagen can't parse.
+        """
+        if mutagen is not None:
+            try:
+                parsed = mutagen.File(path)
+                if parsed is not None and parsed.info.length > 0:
+                    return parsed.info.length
+            except Exception:
+                pass
+
+        cmd = [
+            'ffprobe', '-v', 'error',
+            '-show_entries', 'format=duration',
+            '-of', 'default=noprint_wrappers=1:nokey=1',
+            path
+        ]
+        result = subprocess.run(cmd, capture_output=True)
+        try:
+            return float(result.stdout)
+        except ValueError:
+            return 0.0
+
     def set_voice_style(self, rate: str = "+0%", pitch: str = "+0Hz"):
         """
         Adjust voice characteristics
@@ -131,6 +462,59 @@ class TextToSpeech:
         self.rate = rate
         self.pitch = pitch
 
+    # The Edge-TTS voice roster changes rarely; cache it in-process and
+    # on disk (24h TTL) instead of a network round trip per call
+    _voices = None
+    _voices_lock = threading.Lock()
+    VOICE_CACHE_TTL = 86400
+
+    @classmethod
+    def _voice_cache_path(cls) -> str:
+        cache_home = os.getenv('XDG_CACHE_HOME', os.path.expanduser('~/.cache'))
+        return os.path.join(cache_home, 'movie_recap', 'edge_tts_voices.json')
+
+    @classmethod
+    def _load_voices(cls) -> List[Dict]:
+        """Fetch the voice list, preferring the caches"""
+        with cls._voices_lock:
+            if cls._voices is not None:
+                return cls._voices
+
+            cache_path = cls._voice_cache_path()
+            try:
+                fresh = os.path.getmtime(cache_path) > time.time() - cls.VOICE_CACHE_TTL
+            except OSError:
+                fresh = False
+
+            if fresh:
+                try:
+                    with open(cache_path) as f:
+                        cls._voices = json.load(f)
+                    return cls._voices
+                except (OSError, json.JSONDecodeError):
+                    pass
+
+            try:
+                voices = cls._run(edge_tts.list_voices())
+            except Exception:
+                # Endpoint is flaky (403s); serve a stale cache over failing
+                try:
+                    with open(cache_path) as f:
+                        cls._voices = json.load(f)
+                    return cls._voices
+                except (OSError, json.JSONDecodeError):
+                    raise
+
+            try:
+                os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                with open(cache_path, 'w') as f:
+                    json.dump(voices, f)
+            except OSError:
+                pass
+
+            cls._voices = voices
+            return voices
+
     @classmethod
     def list_voices(cls, language: str = "en") -> List[Dict]:
         """
@@ -139,7 +523,7 @@ class TextToSpeech:
         Returns:
             List of voice information dicts
         """
-        voices = asyncio.run(edge_tts.list_voices())
+        voices = cls._load_voices()
 
         filtered = [
             {
@@ -160,24 +544,23 @@ class TextToSpeech:
 
         Useful for letting users choose their preferred narrator voice
         """
-        previews = []
+        preview_text = text[:200]  # Short preview
+        jobs = [
+            (name, voice, os.path.join(output_folder, f"preview_{name}.mp3"))
+            for name, voice in self.VOICES.items()
+        ]
 
-        for name, voice in self.VOICES.items():
-            original_voice = self.voice
-            self.voice = voice
+        # Each preview is an independent request to the TTS service -
+        # one event loop and gather runs them all concurrently
+        async def generate_all():
+            await asyncio.gather(*(
+                self._generate_one(voice, preview_text, path)
+                for _, voice, path in jobs
+            ))
 
-            try:
-                path = self.generate(
-                    text[:200],  # Short preview
-                    output_folder,
-                    f"preview_{name}.mp3"
-                )
-                previews.append({
-                    "name": name,
-                    "voice": voice,
-                    "path": path
-                })
-            finally:
-                self.voice = original_voice
+        self._run(generate_all())
 
-        return previews
+        return [
+            {"name": name, "voice": voice, "path": path}
+            for name, voice, path in jobs
+        ]
@@ -214,19 +214,10 @@ async function handleSubmit(e) {
         currentJobId = uploadData.job_id;
 
         updateStep('step-upload', 'completed');
-        updateProgress(10, 'Upload complete. Starting processing...');
+        updateProgress(10, 'Upload complete. Processing started...');
 
-        // Start processing
-        const processResponse = await fetch(`/api/process/${currentJobId}`, {
-            method: 'POST'
-        });
-
-        if (!processResponse.ok) {
-            const error = await processResponse.json();
-            throw new Error(error.error || 'Failed to start processing');
-        }
-
-        // Start polling for status
+        // Upload returns 202 with processing already enqueued -
+        // go straight to polling the status endpoint
         startStatusPolling();
 
     } catch (error) {
@@ -0,0 +1,39 @@
+"""
+Job Worker
+Dedicated process that executes recap jobs from the Redis queue
+
+The web tier only enqueues job ids: running jobs inside gevent HTTP
+workers would freeze their event loop for the duration of each native
+Whisper call and load one copy of the model weights per worker. This
+process owns the GPU semaphores, the bounded job pool and the Whisper
+model cache instead, so WEB_CONCURRENCY can scale freely.
+
+Run alongside the API:
+
+    python worker.py
+"""
+
+import sys
+
+from app import EXECUTOR, process_video_job, store
+
+
+def main():
+    if not store.shared:
+        sys.exit(
+            'worker.py needs Redis (set REDIS_URL); without it the app '
+            'runs jobs in-process and no worker is required'
+        )
+
+    print("Job worker started, waiting for jobs")
+    while True:
+        job_id = store.dequeue()
+        if job_id is None:
+            continue
+        # The pool caps concurrency at MAX_CONCURRENT_JOBS, same as the
+        # in-process fallback; extra jobs queue up behind it
+        EXECUTOR.submit(process_video_job, job_id)
+
+
+if __name__ == '__main__':
+    main()